@@ -17,7 +17,8 @@
 # under the License.
 from __future__ import annotations
 
-from enum import Enum
+from enum import Enum, unique
+from typing import TYPE_CHECKING, Any, NamedTuple, TypeVar
 
 # Licensed to Cloudera, Inc. under one
 # or more contributor license agreements.  See the NOTICE file
@@ -35,20 +36,41 @@ from enum import Enum
 # See the License for the specific language governing permissions and
 # limitations under the License.
 """Kerberos security provider."""
+import asyncio
+import contextlib
+import fcntl
 import logging
+import os
+import re
 import shlex
+import struct
 import subprocess
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from airflow.configuration import conf
 from airflow.utils.net import get_hostname
 
+if TYPE_CHECKING:
+    from collections.abc import AsyncGenerator, Coroutine, Generator
+
 NEED_KRB181_WORKAROUND: bool | None = None
 
+# Markers in the ticket cache that require the Kerberos 1.8.1 workaround. New markers can be added
+# as alternatives without adding another pass over the file.
+_CCACHE_CONF_MARKERS: tuple[bytes, ...] = (b"X-CACHECONF:",)
+_CCACHE_CONF_RE = re.compile(b"|".join(re.escape(marker) for marker in _CCACHE_CONF_MARKERS))
+# Bytes carried over between chunks, so a marker split across a chunk boundary is still found.
+_CCACHE_CONF_OVERLAP = max(len(marker) for marker in _CCACHE_CONF_MARKERS) - 1
+_CCACHE_READ_CHUNK_SIZE = 64 * 1024
+
+T = TypeVar("T")
+
 log = logging.getLogger(__name__)
 
 
+@unique
 class KerberosMode(Enum):
     """
     Defines modes for running airflow kerberos.
@@ -65,19 +87,46 @@ def get_kerberos_principal(principal: str | None) -> str:
     return principal or conf.get_mandatory_value("kerberos", "principal").replace("_HOST", get_hostname())
 
 
-def renew_from_kt(principal: str | None, keytab: str, exit_on_fail: bool = True):
+def _run_in_new_loop(coro: Coroutine[Any, Any, T]) -> T:
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        try:
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            loop.close()
+
+
+def _run_coroutine(coro: Coroutine[Any, Any, T]) -> T:
     """
-    Renew kerberos token from keytab.
+    Run a coroutine to completion from synchronous code.
 
-    :param principal: principal
-    :param keytab: keytab file
-    :return: None
+    If the calling thread already runs an event loop (e.g. the triggerer), the coroutine is executed
+    on a private loop in a separate thread instead, so the caller's loop is left untouched.
     """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return _run_in_new_loop(coro)
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="kerberos-renewer") as executor:
+        return executor.submit(_run_in_new_loop, coro).result()
+
+
+class _RenewContext(NamedTuple):
+    """Kerberos settings resolved once per renewer rather than on every renewal."""
+
+    principal: str
+    kinit_path: str
+    ccache: str
+    kinit_args: tuple[str, ...]
+
+
+def _get_renew_context(principal: str | None) -> _RenewContext:
     # The config is specified in seconds. But we ask for that same amount in
     # minutes to give ourselves a large renewal buffer.
     renewal_lifetime = f"{conf.getint('kerberos', 'reinit_frequency')}m"
 
-    cmd_principal = get_kerberos_principal(principal)
     if conf.getboolean("kerberos", "forwardable"):
         forwardable = "-f"
     else:
@@ -88,54 +137,176 @@ def renew_from_kt(principal: str | None, keytab: str, exit_on_fail: bool = True)
     else:
         include_ip = "-A"
 
+    return _RenewContext(
+        principal=get_kerberos_principal(principal),
+        kinit_path=conf.get_mandatory_value("kerberos", "kinit_path"),
+        ccache=conf.get_mandatory_value("kerberos", "ccache"),
+        kinit_args=(forwardable, include_ip, "-r", renewal_lifetime),
+    )
+
+
+def _ccache_path(ccache: str) -> str | None:
+    """Return the file path of a FILE ccache, or None for other cache types (DIR:, KEYRING:, KCM:...)."""
+    if ccache.startswith("FILE:"):
+        return ccache[len("FILE:") :]
+    if ":" in ccache.split("/", 1)[0]:
+        return None
+    return ccache
+
+
+def _open_lock_file(lock_path: str) -> int:
+    # flock() works on read-only descriptors, so the lock file is only ever opened for reading. Opening
+    # an existing file without O_CREAT also works in sticky directories such as /tmp when the file was
+    # created by another user. Symlinks are refused (ELOOP), which also covers a dangling one that
+    # O_CREAT | O_EXCL would otherwise keep reporting as existing.
+    flags = os.O_RDONLY | os.O_NOFOLLOW
+    try:
+        return os.open(lock_path, flags)
+    except FileNotFoundError:
+        pass
+    try:
+        fd = os.open(lock_path, flags | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
+        # Another renewer created it in the meantime.
+        return os.open(lock_path, flags)
+    try:
+        # Keep the lock file readable for renewers running as other users, whatever our umask is.
+        os.fchmod(fd, 0o644)
+    except OSError:
+        os.close(fd)
+        raise
+    return fd
+
+
+@contextlib.contextmanager
+def _open_ccache_lock(ccache: str) -> Generator[tuple[int, str] | None, None, None]:
+    path = _ccache_path(ccache)
+    with contextlib.ExitStack() as stack:
+        lock = None
+        if path is not None:
+            lock_path = f"{path}.lock"
+            try:
+                lock_fd = _open_lock_file(lock_path)
+            except OSError:
+                log.warning(
+                    "Unable to open lock file for %s, continuing without locking", path, exc_info=True
+                )
+            else:
+                # Closing the file releases the lock.
+                stack.callback(os.close, lock_fd)
+                lock = (lock_fd, lock_path)
+        yield lock
+
+
+def _try_flock(lock_fd: int, lock_path: str, operation: int) -> bool:
+    """Try to take the lock without blocking, and log if the caller is about to wait for it."""
+    try:
+        fcntl.flock(lock_fd, operation | fcntl.LOCK_NB)
+    except BlockingIOError:
+        log.info("Waiting for another kerberos renewer to release the lock on %s", lock_path)
+        return False
+    return True
+
+
+@contextlib.contextmanager
+def _ccache_lock(ccache: str, operation: int) -> Generator[None, None, None]:
+    """
+    Hold an advisory ``flock`` on ``<ccache>.lock``.
+
+    Renewers in different processes (e.g. the ``airflow kerberos`` sidecar and workers) share the
+    ccache, so kinit runs under an exclusive lock and ccache reads under a shared one.
+    """
+    with _open_ccache_lock(ccache) as lock:
+        if lock is not None and not _try_flock(*lock, operation):
+            fcntl.flock(lock[0], operation)
+        yield
+
+
+@contextlib.asynccontextmanager
+async def _ccache_lock_async(ccache: str, operation: int) -> AsyncGenerator[None, None]:
+    """Like :func:`_ccache_lock`, but waits for the lock in a thread rather than on the event loop."""
+    with _open_ccache_lock(ccache) as lock:
+        if lock is not None and not _try_flock(*lock, operation):
+            await asyncio.to_thread(fcntl.flock, lock[0], operation)
+        yield
+
+
+def renew_from_kt(principal: str | None, keytab: str, exit_on_fail: bool = True):
+    """
+    Renew kerberos token from keytab.
+
+    :param principal: principal
+    :param keytab: keytab file
+    :return: None
+    """
+    return _renew_from_kt(_get_renew_context(principal), keytab, exit_on_fail)
+
+
+def _exit_on_failure(ret: int) -> None:
+    if ret != 0:
+        sys.exit(ret)
+
+
+def _renew_from_kt(ctx: _RenewContext, keytab: str, exit_on_fail: bool = True) -> int:
+    ret = _run_coroutine(_renew_from_kt_async(ctx, keytab))
+    if exit_on_fail:
+        _exit_on_failure(ret)
+    return ret
+
+
+async def _renew_from_kt_async(ctx: _RenewContext, keytab: str) -> int:
+    """
+    Renew kerberos token from keytab without blocking the event loop.
+
+    :param ctx: resolved kerberos settings
+    :param keytab: keytab file
+    :return: return code of the last executed ``kinit`` command
+    """
+    async with _ccache_lock_async(ctx.ccache, fcntl.LOCK_EX):
+        return await _kinit_from_kt_async(ctx, keytab)
+
+
+async def _kinit_from_kt_async(ctx: _RenewContext, keytab: str) -> int:
     cmdv: list[str] = [
-        conf.get_mandatory_value("kerberos", "kinit_path"),
-        forwardable,
-        include_ip,
-        "-r",
-        renewal_lifetime,
+        ctx.kinit_path,
+        *ctx.kinit_args,
         "-k",  # host ticket
         "-t",
         keytab,  # specify keytab
         "-c",
-        conf.get_mandatory_value("kerberos", "ccache"),  # specify credentials cache
-        cmd_principal,
+        ctx.ccache,  # specify credentials cache
+        ctx.principal,
     ]
     log.info("Re-initialising kerberos from keytab: %s", " ".join(shlex.quote(f) for f in cmdv))
 
-    with subprocess.Popen(
-        cmdv,
+    # Keep the spawn arguments free of preexec_fn/user/group/extra_groups: CPython then starts kinit
+    # with vfork() instead of fork(), so a large parent (e.g. the scheduler) does not pay for
+    # duplicating its page tables just to exec kinit.
+    proc = await asyncio.create_subprocess_exec(
+        *cmdv,
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         close_fds=True,
-        bufsize=-1,
-        universal_newlines=True,
-    ) as subp:
-        subp.wait()
-        if subp.returncode != 0:
-            log.error(
-                "Couldn't reinit from keytab! `kinit` exited with %s.\n%s\n%s",
-                subp.returncode,
-                "\n".join(subp.stdout.readlines() if subp.stdout else []),
-                "\n".join(subp.stderr.readlines() if subp.stderr else []),
-            )
-            if exit_on_fail:
-                sys.exit(subp.returncode)
-            else:
-                return subp.returncode
+    )
+    stdout, stderr = await proc.communicate()
+    if proc.returncode != 0:
+        log.error(
+            "Couldn't reinit from keytab! `kinit` exited with %s.\n%s\n%s",
+            proc.returncode,
+            stdout.decode(errors="replace"),
+            stderr.decode(errors="replace"),
+        )
+        return proc.returncode
 
+    # The ccache scan and the workaround's kinit run in threads so they don't block the event loop.
     global NEED_KRB181_WORKAROUND
     if NEED_KRB181_WORKAROUND is None:
-        NEED_KRB181_WORKAROUND = detect_conf_var()
+        NEED_KRB181_WORKAROUND = await asyncio.to_thread(detect_conf_var)
     if NEED_KRB181_WORKAROUND:
         # (From: HUE-640). Kerberos clock have seconds level granularity. Make sure we
         # renew the ticket after the initial valid time.
-        time.sleep(1.5)
-        ret = perform_krb181_workaround(cmd_principal)
-        if exit_on_fail and ret != 0:
-            sys.exit(ret)
-        else:
-            return ret
+        await asyncio.sleep(1.5)
+        return await asyncio.to_thread(perform_krb181_workaround, ctx.principal)
     return 0
 
 
@@ -155,9 +326,12 @@ def perform_krb181_workaround(principal: str):
 
     log.info("Renewing kerberos ticket to work around kerberos 1.8.1: %s", " ".join(cmdv))
 
-    ret = subprocess.call(cmdv, close_fds=True)
+    # Same as for the keytab kinit: no preexec_fn/user/group, so the vfork() fast path is used.
+    proc = subprocess.run(cmdv, capture_output=True, text=True, check=False, close_fds=True)
+    ret = proc.returncode
 
     if ret != 0:
+        log.error("`kinit -R` exited with %s.\n%s\n%s", ret, proc.stdout, proc.stderr)
         principal = f"{principal or conf.get('kerberos', 'principal')}/{get_hostname()}"
         ccache = conf.get("kerberos", "ccache")
         log.error(
@@ -185,8 +359,144 @@ def detect_conf_var() -> bool:
     ticket_cache = conf.get_mandatory_value("kerberos", "ccache")
 
     with open(ticket_cache, "rb") as file:
-        # Note: this file is binary, so we check against a bytearray.
-        return b"X-CACHECONF:" in file.read()
+        # Note: this file is binary, so we check against a bytes pattern. The cache is read in bounded
+        # chunks rather than memory-mapped: kinit may rewrite it in place at any time, and touching a
+        # truncated mapping kills the process with SIGBUS.
+        tail = b""
+        while chunk := file.read(_CCACHE_READ_CHUNK_SIZE):
+            data = tail + chunk
+            if _CCACHE_CONF_RE.search(data):
+                return True
+            tail = data[-_CCACHE_CONF_OVERLAP:] if _CCACHE_CONF_OVERLAP else b""
+    return False
+
+
+class _CcacheReader:
+    """
+    Minimal reader for MIT FILE credential caches (format versions 3 and 4).
+
+    See https://web.mit.edu/kerberos/krb5-devel/doc/formats/ccache_file_format.html
+    """
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.offset = 0
+        self.version = 0
+
+    def _unpack(self, fmt: str) -> tuple[int, ...]:
+        values = struct.unpack_from(fmt, self.data, self.offset)
+        self.offset += struct.calcsize(fmt)
+        return values
+
+    def _read_data(self) -> bytes:
+        (length,) = self._unpack(">I")
+        if self.offset + length > len(self.data):
+            raise struct.error("truncated ccache")
+        value = self.data[self.offset : self.offset + length]
+        self.offset += length
+        return value
+
+    def read_header(self) -> None:
+        (self.version,) = self._unpack(">H")
+        if self.version not in (0x0503, 0x0504):
+            raise ValueError(f"Unsupported ccache format version {self.version:#06x}")
+        if self.version == 0x0504:
+            (header_len,) = self._unpack(">H")
+            self.offset += header_len
+
+    def read_principal(self) -> tuple[str, list[str]]:
+        _name_type, num_components = self._unpack(">II")
+        realm = self._read_data().decode(errors="replace")
+        components = [self._read_data().decode(errors="replace") for _ in range(num_components)]
+        return realm, components
+
+    def read_credential_endtime(self) -> tuple[list[str], int]:
+        """Read one credential and return the server principal components and the ticket end time."""
+        self.read_principal()  # client
+        _server_realm, server_components = self.read_principal()
+        self._unpack(">H")  # key enctype
+        if self.version == 0x0503:
+            self._unpack(">H")  # version 3 writes the enctype twice
+        self._read_data()  # key
+        _authtime, _starttime, endtime, _renew_till = self._unpack(">IIII")
+        self._unpack(">BI")  # is_skey, ticket_flags
+        for _ in range(self._unpack(">I")[0]):  # addresses
+            self._unpack(">H")
+            self._read_data()
+        for _ in range(self._unpack(">I")[0]):  # authdata
+            self._unpack(">H")
+            self._read_data()
+        self._read_data()  # ticket
+        self._read_data()  # second ticket
+        return server_components, endtime
+
+    def at_end(self) -> bool:
+        return self.offset >= len(self.data)
+
+
+def _tgt_seconds_remaining(ccache: str, principal: str) -> int:
+    """
+    Return how many seconds the TGT for ``principal`` in a FILE ccache is still valid for.
+
+    Returns 0 when the ccache cannot be inspected (missing file, non-FILE cache type, unknown format,
+    or a ticket for another principal), so the caller falls back to renewing.
+    """
+    path = _ccache_path(ccache)
+    if path is None or not os.path.exists(path):
+        return 0
+    try:
+        # Lock before opening, so a ccache replaced by a concurrent kinit is read from its new inode.
+        with _ccache_lock(path, fcntl.LOCK_SH), open(path, "rb") as file:
+            reader = _CcacheReader(file.read())
+        reader.read_header()
+        realm, components = reader.read_principal()
+        name = "/".join(components)
+        if principal not in (name, f"{name}@{realm}"):
+            return 0
+        endtime = 0
+        while not reader.at_end():
+            server_components, cred_endtime = reader.read_credential_endtime()
+            if server_components[:1] == ["krbtgt"]:
+                endtime = max(endtime, cred_endtime)
+    except (OSError, ValueError, struct.error):
+        log.debug("Unable to read TGT lifetime from %s", path, exc_info=True)
+        return 0
+    return max(0, int(endtime - time.time()))
+
+
+def _needs_renewal(ctx: _RenewContext, period: int) -> bool:
+    remaining = _tgt_seconds_remaining(ctx.ccache, ctx.principal)
+    if remaining > 2 * period:
+        log.debug("Kerberos ticket is valid for another %s seconds, skipping renewal", remaining)
+        return False
+    return True
+
+
+def _start_renewer(principal: str | None, keytab: str, mode: KerberosMode) -> _RenewContext:
+    if not keytab:
+        log.warning("Keytab renewer not starting, no keytab configured")
+        sys.exit(0)
+
+    log.info("Using airflow kerberos with mode: %s", mode.value)
+    return _get_renew_context(principal)
+
+
+class _RenewalSchedule:
+    """
+    Schedule of STANDARD mode renewals.
+
+    Renewals are scheduled against a monotonic deadline, so the time spent in kinit does not push
+    every following renewal later.
+    """
+
+    def __init__(self):
+        self.period = conf.getint("kerberos", "reinit_frequency")
+        self.next_run = time.monotonic()
+
+    def advance(self) -> float:
+        """Move to the next renewal and return how long to sleep until it is due."""
+        self.next_run += self.period
+        return max(0.0, self.next_run - time.monotonic())
 
 
 def run(principal: str | None, keytab: str, mode: KerberosMode = KerberosMode.STANDARD):
@@ -198,15 +508,33 @@ def run(principal: str | None, keytab: str, mode: KerberosMode = KerberosMode.ST
     :param mode: mode to run the airflow kerberos in
     :return: None
     """
-    if not keytab:
-        log.warning("Keytab renewer not starting, no keytab configured")
-        sys.exit(0)
+    ctx = _start_renewer(principal, keytab, mode)
+    if mode is KerberosMode.STANDARD:
+        schedule = _RenewalSchedule()
+        while True:
+            if _needs_renewal(ctx, schedule.period):
+                _renew_from_kt(ctx, keytab)
+            time.sleep(schedule.advance())
+    elif mode is KerberosMode.ONE_TIME:
+        _renew_from_kt(ctx, keytab)
 
-    log.info("Using airflow kerberos with mode: %s", mode.value)
 
-    if mode == KerberosMode.STANDARD:
+async def run_async(principal: str | None, keytab: str, mode: KerberosMode = KerberosMode.STANDARD):
+    """
+    Run the kerberos renewer on an already running event loop.
+
+    :param principal: principal name
+    :param keytab: keytab file
+    :param mode: mode to run the airflow kerberos in
+    :return: None
+    """
+    ctx = _start_renewer(principal, keytab, mode)
+    if mode is KerberosMode.STANDARD:
+        schedule = _RenewalSchedule()
         while True:
-            renew_from_kt(principal, keytab)
-            time.sleep(conf.getint("kerberos", "reinit_frequency"))
-    elif mode == KerberosMode.ONE_TIME:
-        renew_from_kt(principal, keytab)
+            # Reading the ccache waits on the shared lock, which kinit in another process may hold.
+            if await asyncio.to_thread(_needs_renewal, ctx, schedule.period):
+                _exit_on_failure(await _renew_from_kt_async(ctx, keytab))
+            await asyncio.sleep(schedule.advance())
+    elif mode is KerberosMode.ONE_TIME:
+        _exit_on_failure(await _renew_from_kt_async(ctx, keytab))
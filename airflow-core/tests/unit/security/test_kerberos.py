@@ -17,8 +17,15 @@
 # under the License.
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import fcntl
 import logging
+import os
 import shlex
+import struct
+import threading
+import time
 from unittest import mock
 
 import pytest
@@ -31,6 +38,64 @@ from tests_common.test_utils.config import conf_vars
 pytestmark = pytest.mark.db_test
 
 
+@pytest.fixture
+def mock_kinit():
+    with mock.patch(
+        "airflow.security.kerberos.asyncio.create_subprocess_exec", new_callable=mock.AsyncMock
+    ) as mock_exec:
+        mock_proc = mock_exec.return_value
+        mock_proc.returncode = 0
+        mock_proc.communicate = mock.AsyncMock(return_value=(b"", b""))
+        with mock.patch(
+            "airflow.security.kerberos._ccache_lock_async", return_value=contextlib.nullcontext()
+        ):
+            yield mock_exec
+
+
+def _ccache_data(*values: bytes) -> bytes:
+    return b"".join(struct.pack(">I", len(value)) + value for value in values)
+
+
+def _ccache_principal(realm: str, *components: str) -> bytes:
+    return struct.pack(">II", 1, len(components)) + _ccache_data(
+        realm.encode(), *(c.encode() for c in components)
+    )
+
+
+def _ccache_bytes(client: bytes, creds: list[tuple[bytes, int]], version: int = 0x0504) -> bytes:
+    """Build a FILE ccache with the given primary principal and (server principal, endtime) credentials."""
+    content = struct.pack(">H", version)
+    if version == 0x0504:
+        header = struct.pack(">HHiI", 1, 8, 0, 0)  # KDC time offset tag
+        content += struct.pack(">H", len(header)) + header
+    content += client
+    for server, endtime in creds:
+        content += client + server
+        content += struct.pack(">H", 18) * (2 if version == 0x0503 else 1) + _ccache_data(b"k" * 32)
+        content += struct.pack(">IIII", 0, 0, endtime, endtime)
+        content += struct.pack(">BI", 0, 0)
+        content += struct.pack(">II", 0, 0)  # no addresses, no authdata
+        content += _ccache_data(b"ticket", b"")
+    return content
+
+
+def _can_flock(path: str, operation: int) -> bool:
+    with open(path) as lock_file:
+        try:
+            fcntl.flock(lock_file, operation | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False
+    return True
+
+
+@contextlib.contextmanager
+def _hold_flock(path: str, operation: int):
+    """Hold a lock from a separate descriptor, as another renewer process would."""
+    with open(path) as lock_file:
+        fcntl.flock(lock_file, operation)
+        yield lock_file.fileno()
+
+
 class TestKerberos:
     @pytest.mark.parametrize(
         "kerberos_config, expected_cmd",
@@ -85,17 +150,18 @@ class TestKerberos:
             ),
         ],
     )
-    @mock.patch("time.sleep", return_value=None)
-    @mock.patch("airflow.security.kerberos.open", mock.mock_open(read_data=b"X-CACHECONF:"))
+    @mock.patch("asyncio.sleep", new_callable=mock.AsyncMock)
+    @mock.patch("airflow.security.kerberos.detect_conf_var", mock.Mock(return_value=True))
     @mock.patch("airflow.security.kerberos.NEED_KRB181_WORKAROUND", None)
     @mock.patch("airflow.security.kerberos.subprocess")
-    def test_renew_from_kt(self, mock_subprocess, mock_sleep, kerberos_config, expected_cmd, caplog):
+    def test_renew_from_kt(
+        self, mock_subprocess, mock_sleep, mock_kinit, kerberos_config, expected_cmd, caplog
+    ):
         expected_cmd_text = " ".join(shlex.quote(f) for f in expected_cmd)
 
         with conf_vars(kerberos_config), caplog.at_level(logging.INFO, logger=kerberos.log.name):
             caplog.clear()
-            mock_subprocess.Popen.return_value.__enter__.return_value.returncode = 0
-            mock_subprocess.call.return_value = 0
+            mock_subprocess.run.return_value.returncode = 0
             renew_from_kt(principal="test-principal", keytab="keytab")
 
         assert caplog.messages == [
@@ -103,28 +169,28 @@ class TestKerberos:
             "Renewing kerberos ticket to work around kerberos 1.8.1: kinit -c /tmp/airflow_krb5_ccache -R",
         ]
 
-        assert mock_subprocess.Popen.call_args.args[0] == expected_cmd
+        mock_kinit.assert_awaited_once_with(
+            *expected_cmd,
+            stdout=mock_subprocess.PIPE,
+            stderr=mock_subprocess.PIPE,
+            close_fds=True,
+        )
+        mock_sleep.assert_awaited_once_with(1.5)
         assert mock_subprocess.mock_calls == [
-            mock.call.Popen(
-                expected_cmd,
-                bufsize=-1,
+            mock.call.run(
+                ["kinit", "-c", "/tmp/airflow_krb5_ccache", "-R"],
+                capture_output=True,
+                text=True,
+                check=False,
                 close_fds=True,
-                stderr=mock_subprocess.PIPE,
-                stdout=mock_subprocess.PIPE,
-                universal_newlines=True,
             ),
-            mock.call.Popen().__enter__(),
-            mock.call.Popen().__enter__().wait(),
-            mock.call.Popen().__exit__(None, None, None),
-            mock.call.call(["kinit", "-c", "/tmp/airflow_krb5_ccache", "-R"], close_fds=True),
         ]
 
     @mock.patch("airflow.security.kerberos.subprocess")
     @mock.patch("airflow.security.kerberos.NEED_KRB181_WORKAROUND", None)
-    @mock.patch("airflow.security.kerberos.open", mock.mock_open(read_data=b""))
-    def test_renew_from_kt_without_workaround(self, mock_subprocess, caplog):
-        mock_subprocess.Popen.return_value.__enter__.return_value.returncode = 0
-        mock_subprocess.call.return_value = 0
+    @mock.patch("airflow.security.kerberos.detect_conf_var", mock.Mock(return_value=False))
+    def test_renew_from_kt_without_workaround(self, mock_subprocess, mock_kinit, caplog):
+        mock_subprocess.run.return_value.returncode = 0
 
         with caplog.at_level(logging.INFO, logger=kerberos.log.name):
             caplog.clear()
@@ -134,39 +200,197 @@ class TestKerberos:
                 "kinit -f -a -r 3600m -k -t keytab -c /tmp/airflow_krb5_ccache test-principal"
             ]
 
-        assert mock_subprocess.mock_calls == [
-            mock.call.Popen(
-                [
-                    "kinit",
-                    "-f",
-                    "-a",
-                    "-r",
-                    "3600m",
-                    "-k",
-                    "-t",
-                    "keytab",
-                    "-c",
-                    "/tmp/airflow_krb5_ccache",
-                    "test-principal",
-                ],
-                bufsize=-1,
-                close_fds=True,
-                stderr=mock_subprocess.PIPE,
-                stdout=mock_subprocess.PIPE,
-                universal_newlines=True,
-            ),
-            mock.call.Popen().__enter__(),
-            mock.call.Popen().__enter__().wait(),
-            mock.call.Popen().__exit__(None, None, None),
-        ]
+        mock_kinit.assert_awaited_once_with(
+            "kinit",
+            "-f",
+            "-a",
+            "-r",
+            "3600m",
+            "-k",
+            "-t",
+            "keytab",
+            "-c",
+            "/tmp/airflow_krb5_ccache",
+            "test-principal",
+            stdout=mock_subprocess.PIPE,
+            stderr=mock_subprocess.PIPE,
+            close_fds=True,
+        )
+        assert mock_subprocess.mock_calls == []
+
+    @mock.patch("airflow.security.kerberos.subprocess")
+    @mock.patch("airflow.security.kerberos.NEED_KRB181_WORKAROUND", None)
+    @mock.patch("airflow.security.kerberos.detect_conf_var", mock.Mock(return_value=False))
+    def test_renew_from_kt_inside_running_loop(self, mock_subprocess, mock_kinit):
+        async def renew_from_coroutine():
+            return renew_from_kt(principal="test-principal", keytab="keytab")
+
+        assert asyncio.run(renew_from_coroutine()) == 0
+        mock_kinit.assert_awaited_once()
+
+    @mock.patch("airflow.security.kerberos.subprocess")
+    @mock.patch("airflow.security.kerberos.NEED_KRB181_WORKAROUND", None)
+    @mock.patch("asyncio.sleep", new_callable=mock.AsyncMock)
+    def test_renew_from_kt_async_keeps_workaround_off_the_loop(self, mock_sleep, mock_subprocess, mock_kinit):
+        loop_thread = threading.get_ident()
+        called_from = []
+
+        def detect_conf_var():
+            called_from.append(threading.get_ident())
+            return True
+
+        def run_kinit_renew(*args, **kwargs):
+            called_from.append(threading.get_ident())
+            return mock.MagicMock(returncode=0)
+
+        mock_subprocess.run.side_effect = run_kinit_renew
+        ctx = kerberos._get_renew_context("test-principal")
+        with mock.patch("airflow.security.kerberos.detect_conf_var", side_effect=detect_conf_var):
+            assert asyncio.run(kerberos._renew_from_kt_async(ctx, "keytab")) == 0
+
+        assert len(called_from) == 2
+        assert loop_thread not in called_from
 
     @mock.patch("airflow.security.kerberos.subprocess")
     @mock.patch("airflow.security.kerberos.NEED_KRB181_WORKAROUND", None)
-    def test_renew_from_kt_failed(self, mock_subprocess, caplog):
-        mock_subp = mock_subprocess.Popen.return_value.__enter__.return_value
-        mock_subp.returncode = 1
-        mock_subp.stdout = mock.MagicMock(name="stdout", **{"readlines.return_value": ["STDOUT"]})
-        mock_subp.stderr = mock.MagicMock(name="stderr", **{"readlines.return_value": ["STDERR"]})
+    @mock.patch("airflow.security.kerberos.detect_conf_var", mock.Mock(return_value=False))
+    def test_renew_from_kt_locks_ccache(self, mock_subprocess, mock_kinit):
+        with mock.patch(
+            "airflow.security.kerberos._ccache_lock_async", return_value=contextlib.nullcontext()
+        ) as mock_lock:
+            renew_from_kt(principal="test-principal", keytab="keytab")
+        mock_lock.assert_called_once_with("/tmp/airflow_krb5_ccache", fcntl.LOCK_EX)
+
+    @pytest.mark.parametrize("ccache_prefix", ["", "FILE:"])
+    def test_ccache_lock_async_is_exclusive(self, tmp_path, ccache_prefix):
+        ccache = tmp_path / "krb5cc"
+
+        async def hold_lock():
+            async with kerberos._ccache_lock_async(f"{ccache_prefix}{ccache}", fcntl.LOCK_EX):
+                assert not _can_flock(f"{ccache}.lock", fcntl.LOCK_SH)
+
+        asyncio.run(hold_lock())
+        assert _can_flock(f"{ccache}.lock", fcntl.LOCK_EX)
+
+    def test_ccache_lock_shared(self, tmp_path):
+        ccache = tmp_path / "krb5cc"
+        with kerberos._ccache_lock(str(ccache), fcntl.LOCK_SH):
+            assert _can_flock(f"{ccache}.lock", fcntl.LOCK_SH)
+            assert not _can_flock(f"{ccache}.lock", fcntl.LOCK_EX)
+
+    def test_ccache_lock_file_readable_by_other_users(self, tmp_path):
+        ccache = tmp_path / "krb5cc"
+        old_umask = os.umask(0o077)
+        try:
+            with kerberos._ccache_lock(str(ccache), fcntl.LOCK_EX):
+                pass
+        finally:
+            os.umask(old_umask)
+        assert os.stat(f"{ccache}.lock").st_mode & 0o777 == 0o644
+
+    def test_ccache_lock_existing_read_only_lock_file(self, tmp_path):
+        ccache = tmp_path / "krb5cc"
+        lock_path = tmp_path / "krb5cc.lock"
+        lock_path.touch(mode=0o444)
+        with kerberos._ccache_lock(str(ccache), fcntl.LOCK_EX):
+            assert not _can_flock(str(lock_path), fcntl.LOCK_SH)
+
+    def test_ccache_lock_uncontended_does_not_log(self, tmp_path, caplog):
+        ccache = tmp_path / "krb5cc"
+        with (
+            caplog.at_level(logging.INFO, logger=kerberos.log.name),
+            kerberos._ccache_lock(str(ccache), fcntl.LOCK_EX),
+        ):
+            pass
+        assert caplog.messages == []
+
+    def test_ccache_lock_logs_while_waiting(self, tmp_path, caplog):
+        ccache = tmp_path / "krb5cc"
+        lock_path = f"{ccache}.lock"
+        (tmp_path / "krb5cc.lock").touch()
+        with (
+            caplog.at_level(logging.INFO, logger=kerberos.log.name),
+            _hold_flock(lock_path, fcntl.LOCK_EX) as held_fd,
+        ):
+            assert not _can_flock(lock_path, fcntl.LOCK_SH)
+            threading.Timer(0.2, fcntl.flock, (held_fd, fcntl.LOCK_UN)).start()
+            with kerberos._ccache_lock(str(ccache), fcntl.LOCK_SH):
+                assert not _can_flock(lock_path, fcntl.LOCK_EX)
+        assert caplog.messages == [f"Waiting for another kerberos renewer to release the lock on {lock_path}"]
+
+    def test_ccache_lock_async_logs_while_waiting(self, tmp_path, caplog):
+        ccache = tmp_path / "krb5cc"
+        lock_path = f"{ccache}.lock"
+        (tmp_path / "krb5cc.lock").touch()
+
+        async def take_lock():
+            async with kerberos._ccache_lock_async(str(ccache), fcntl.LOCK_EX):
+                assert not _can_flock(lock_path, fcntl.LOCK_SH)
+
+        with (
+            caplog.at_level(logging.INFO, logger=kerberos.log.name),
+            _hold_flock(lock_path, fcntl.LOCK_SH) as held_fd,
+        ):
+            threading.Timer(0.2, fcntl.flock, (held_fd, fcntl.LOCK_UN)).start()
+            asyncio.run(take_lock())
+        assert caplog.messages == [f"Waiting for another kerberos renewer to release the lock on {lock_path}"]
+
+    @pytest.mark.parametrize("target", ["nonexistent", "existing"])
+    def test_ccache_lock_refuses_symlinked_lock_file(self, tmp_path, caplog, target):
+        ccache = tmp_path / "krb5cc"
+        target_path = tmp_path / target
+        if target == "existing":
+            target_path.touch()
+        (tmp_path / "krb5cc.lock").symlink_to(target_path)
+
+        with (
+            caplog.at_level(logging.WARNING, logger=kerberos.log.name),
+            kerberos._ccache_lock(str(ccache), fcntl.LOCK_EX),
+        ):
+            pass
+        assert caplog.messages == [f"Unable to open lock file for {ccache}, continuing without locking"]
+        assert not (tmp_path / "nonexistent").exists()
+
+    @mock.patch("airflow.security.kerberos.os.fchmod", side_effect=PermissionError)
+    def test_ccache_lock_closes_fd_when_chmod_fails(self, mock_fchmod, tmp_path):
+        with pytest.raises(PermissionError):
+            kerberos._open_lock_file(str(tmp_path / "krb5cc.lock"))
+        with pytest.raises(OSError, match="Bad file descriptor"):
+            os.fstat(mock_fchmod.call_args.args[0])
+
+    def test_tgt_seconds_remaining_locks_before_opening(self, tmp_path):
+        ccache = tmp_path / "krb5cc"
+        ccache.write_bytes(b"")
+        events = []
+
+        @contextlib.contextmanager
+        def record_lock(path, operation):
+            events.append(("lock", operation))
+            yield
+
+        def record_open(*args, **kwargs):
+            events.append(("open", args[0]))
+            return open(*args, **kwargs)
+
+        with (
+            mock.patch("airflow.security.kerberos._ccache_lock", record_lock),
+            mock.patch("airflow.security.kerberos.open", record_open, create=True),
+        ):
+            kerberos._tgt_seconds_remaining(str(ccache), "airflow")
+        assert events == [("lock", fcntl.LOCK_SH), ("open", str(ccache))]
+
+    @mock.patch("airflow.security.kerberos.fcntl.flock")
+    def test_ccache_lock_skipped_for_non_file_ccache(self, mock_flock):
+        with kerberos._ccache_lock("KEYRING:persistent:1000", fcntl.LOCK_SH):
+            pass
+        mock_flock.assert_not_called()
+
+    @mock.patch("airflow.security.kerberos.subprocess")
+    @mock.patch("airflow.security.kerberos.NEED_KRB181_WORKAROUND", None)
+    def test_renew_from_kt_failed(self, mock_subprocess, mock_kinit, caplog):
+        mock_proc = mock_kinit.return_value
+        mock_proc.returncode = 1
+        mock_proc.communicate.return_value = (b"STDOUT", b"STDERR")
 
         caplog.clear()
         with pytest.raises(SystemExit) as ctx:
@@ -182,40 +406,33 @@ class TestKerberos:
             "Couldn't reinit from keytab! `kinit` exited with 1.\nSTDOUT\nSTDERR",
         ]
 
-        assert mock_subprocess.mock_calls == [
-            mock.call.Popen(
-                [
-                    "kinit",
-                    "-f",
-                    "-a",
-                    "-r",
-                    "3600m",
-                    "-k",
-                    "-t",
-                    "keytab",
-                    "-c",
-                    "/tmp/airflow_krb5_ccache",
-                    "test-principal",
-                ],
-                bufsize=-1,
-                close_fds=True,
-                stderr=mock_subprocess.PIPE,
-                stdout=mock_subprocess.PIPE,
-                universal_newlines=True,
-            ),
-            mock.call.Popen().__enter__(),
-            mock.call.Popen().__enter__().wait(),
-            mock.call.Popen().__exit__(mock.ANY, mock.ANY, mock.ANY),
-        ]
+        mock_kinit.assert_awaited_once_with(
+            "kinit",
+            "-f",
+            "-a",
+            "-r",
+            "3600m",
+            "-k",
+            "-t",
+            "keytab",
+            "-c",
+            "/tmp/airflow_krb5_ccache",
+            "test-principal",
+            stdout=mock_subprocess.PIPE,
+            stderr=mock_subprocess.PIPE,
+            close_fds=True,
+        )
+        assert mock_subprocess.mock_calls == []
 
     @mock.patch("airflow.security.kerberos.subprocess")
     @mock.patch("airflow.security.kerberos.NEED_KRB181_WORKAROUND", None)
-    @mock.patch("airflow.security.kerberos.open", mock.mock_open(read_data=b"X-CACHECONF:"))
+    @mock.patch("airflow.security.kerberos.detect_conf_var", mock.Mock(return_value=True))
     @mock.patch("airflow.security.kerberos.get_hostname", return_value="HOST")
-    @mock.patch("time.sleep", return_value=None)
-    def test_renew_from_kt_failed_workaround(self, mock_sleep, mock_getfqdn, mock_subprocess, caplog):
-        mock_subprocess.Popen.return_value.__enter__.return_value.returncode = 0
-        mock_subprocess.call.return_value = 1
+    @mock.patch("asyncio.sleep", new_callable=mock.AsyncMock)
+    def test_renew_from_kt_failed_workaround(
+        self, mock_sleep, mock_getfqdn, mock_subprocess, mock_kinit, caplog
+    ):
+        mock_subprocess.run.return_value = mock.MagicMock(returncode=1, stdout="STDOUT", stderr="STDERR")
 
         caplog.clear()
         with pytest.raises(SystemExit) as ctx:
@@ -223,12 +440,13 @@ class TestKerberos:
         assert ctx.value.code == 1
 
         log_records = [record for record in caplog.record_tuples if record[0] == kerberos.log.name]
-        assert len(log_records) == 3, log_records
-        assert [lr[1] for lr in log_records] == [logging.INFO, logging.INFO, logging.ERROR]
+        assert len(log_records) == 4, log_records
+        assert [lr[1] for lr in log_records] == [logging.INFO, logging.INFO, logging.ERROR, logging.ERROR]
         assert [lr[2] for lr in log_records] == [
             "Re-initialising kerberos from keytab: "
             "kinit -f -a -r 3600m -k -t keytab -c /tmp/airflow_krb5_ccache test-principal",
             "Renewing kerberos ticket to work around kerberos 1.8.1: kinit -c /tmp/airflow_krb5_ccache -R",
+            "`kinit -R` exited with 1.\nSTDOUT\nSTDERR",
             "Couldn't renew kerberos ticket in order to work around "
             "Kerberos 1.8.1 issue. Please check that the ticket for 'test-principal/HOST' is still "
             "renewable:\n  $ kinit -f -c /tmp/airflow_krb5_ccache\n"
@@ -237,33 +455,113 @@ class TestKerberos:
             "the 'test-principal/HOST' and `krbtgt' principals.",
         ]
 
+        mock_kinit.assert_awaited_once_with(
+            "kinit",
+            "-f",
+            "-a",
+            "-r",
+            "3600m",
+            "-k",
+            "-t",
+            "keytab",
+            "-c",
+            "/tmp/airflow_krb5_ccache",
+            "test-principal",
+            stdout=mock_subprocess.PIPE,
+            stderr=mock_subprocess.PIPE,
+            close_fds=True,
+        )
         assert mock_subprocess.mock_calls == [
-            mock.call.Popen(
-                [
-                    "kinit",
-                    "-f",
-                    "-a",
-                    "-r",
-                    "3600m",
-                    "-k",
-                    "-t",
-                    "keytab",
-                    "-c",
-                    "/tmp/airflow_krb5_ccache",
-                    "test-principal",
-                ],
-                bufsize=-1,
+            mock.call.run(
+                ["kinit", "-c", "/tmp/airflow_krb5_ccache", "-R"],
+                capture_output=True,
+                text=True,
+                check=False,
                 close_fds=True,
-                stderr=mock_subprocess.PIPE,
-                stdout=mock_subprocess.PIPE,
-                universal_newlines=True,
             ),
-            mock.call.Popen().__enter__(),
-            mock.call.Popen().__enter__().wait(),
-            mock.call.Popen().__exit__(None, None, None),
-            mock.call.call(["kinit", "-c", "/tmp/airflow_krb5_ccache", "-R"], close_fds=True),
         ]
 
+    @pytest.mark.parametrize(
+        "content, expected",
+        [
+            pytest.param(b"", False, id="empty"),
+            pytest.param(b"\x05\x04" + b"\x00" * 100, False, id="no-marker"),
+            pytest.param(b"\x05\x04X-CACHECONF:refresh_time", True, id="first-chunk"),
+            pytest.param(b"\x00" * 10 + b"X-CACHECONF:" + b"\x00" * 10, True, id="across-chunks"),
+            pytest.param(b"\x00" * 40 + b"X-CACHECONF:", True, id="last-chunk"),
+            pytest.param(b"\x00" * 4 + b"X-CACHECONF" + b"\x00" * 40, False, id="partial-marker"),
+        ],
+    )
+    @mock.patch("airflow.security.kerberos._CCACHE_READ_CHUNK_SIZE", 16)
+    def test_detect_conf_var(self, tmp_path, content, expected):
+        ccache = tmp_path / "krb5cc"
+        ccache.write_bytes(content)
+        with conf_vars({("kerberos", "ccache"): str(ccache)}):
+            assert kerberos.detect_conf_var() is expected
+
+    @pytest.mark.parametrize("version", [0x0503, 0x0504])
+    def test_tgt_seconds_remaining(self, tmp_path, version):
+        client = _ccache_principal("EXAMPLE.COM", "airflow", "host")
+        creds = [
+            (_ccache_principal("X-CACHECONF:", "krb5_ccache_conf_data", "pa_type"), 0),
+            (_ccache_principal("EXAMPLE.COM", "krbtgt", "EXAMPLE.COM"), int(time.time()) + 7200),
+            (_ccache_principal("EXAMPLE.COM", "HTTP", "web"), int(time.time()) + 36000),
+        ]
+        ccache = tmp_path / "krb5cc"
+        ccache.write_bytes(_ccache_bytes(client, creds, version=version))
+
+        for principal in ("airflow/host", "airflow/host@EXAMPLE.COM"):
+            assert 7100 < kerberos._tgt_seconds_remaining(str(ccache), principal) <= 7200
+        assert 7100 < kerberos._tgt_seconds_remaining(f"FILE:{ccache}", "airflow/host") <= 7200
+        assert kerberos._tgt_seconds_remaining(str(ccache), "other/host") == 0
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            pytest.param(None, id="missing"),
+            pytest.param(b"", id="empty"),
+            pytest.param(b"\x05\x02garbage", id="unsupported-version"),
+            pytest.param(
+                _ccache_bytes(
+                    _ccache_principal("EXAMPLE.COM", "airflow"),
+                    [(_ccache_principal("EXAMPLE.COM", "krbtgt", "EXAMPLE.COM"), 2**32 - 1)],
+                )[:-10],
+                id="truncated",
+            ),
+            pytest.param(
+                _ccache_bytes(
+                    _ccache_principal("EXAMPLE.COM", "airflow"),
+                    [(_ccache_principal("EXAMPLE.COM", "krbtgt", "EXAMPLE.COM"), 1)],
+                ),
+                id="expired",
+            ),
+        ],
+    )
+    def test_tgt_seconds_remaining_unusable(self, tmp_path, content):
+        ccache = tmp_path / "krb5cc"
+        if content is not None:
+            ccache.write_bytes(content)
+        assert kerberos._tgt_seconds_remaining(str(ccache), "airflow") == 0
+
+    def test_tgt_seconds_remaining_non_file_ccache(self):
+        assert kerberos._tgt_seconds_remaining("KEYRING:persistent:1000", "airflow") == 0
+
+    @mock.patch("airflow.security.kerberos._renew_from_kt")
+    @mock.patch("airflow.security.kerberos._tgt_seconds_remaining")
+    @mock.patch("time.sleep")
+    def test_run_skips_renewal_while_tgt_is_valid(
+        self, mock_sleep, mock_tgt_seconds_remaining, mock_renew_from_kt
+    ):
+        mock_tgt_seconds_remaining.side_effect = [36000, 7200, 0]
+        mock_sleep.side_effect = [None, None, SystemExit(42)]
+        with conf_vars({("kerberos", "reinit_frequency"): "3600"}), pytest.raises(SystemExit):
+            kerberos.run(principal="test-principal", keytab="/tmp/keytab")
+        assert (
+            mock_tgt_seconds_remaining.mock_calls
+            == [mock.call("/tmp/airflow_krb5_ccache", "test-principal")] * 3
+        )
+        assert mock_renew_from_kt.call_count == 2
+
     def test_run_without_keytab(self, caplog):
         with caplog.at_level(logging.WARNING, logger=kerberos.log.name):
             caplog.clear()
@@ -272,19 +570,95 @@ class TestKerberos:
         assert ctx.value.code == 0
         assert caplog.messages == ["Keytab renewer not starting, no keytab configured"]
 
-    @mock.patch("airflow.security.kerberos.renew_from_kt")
+    @mock.patch("airflow.security.kerberos._tgt_seconds_remaining", mock.Mock(return_value=0))
+    @mock.patch("airflow.security.kerberos._renew_from_kt")
     @mock.patch("time.sleep", return_value=None)
     def test_run(self, mock_sleep, mock_renew_from_kt):
         mock_renew_from_kt.side_effect = [1, 1, SystemExit(42)]
         with pytest.raises(SystemExit) as ctx:
             kerberos.run(principal="test-principal", keytab="/tmp/keytab")
         assert ctx.value.code == 42
+        renew_ctx = kerberos._RenewContext(
+            principal="test-principal",
+            kinit_path="kinit",
+            ccache="/tmp/airflow_krb5_ccache",
+            kinit_args=("-f", "-a", "-r", "3600m"),
+        )
         assert mock_renew_from_kt.mock_calls == [
-            mock.call("test-principal", "/tmp/keytab"),
-            mock.call("test-principal", "/tmp/keytab"),
-            mock.call("test-principal", "/tmp/keytab"),
+            mock.call(renew_ctx, "/tmp/keytab"),
+            mock.call(renew_ctx, "/tmp/keytab"),
+            mock.call(renew_ctx, "/tmp/keytab"),
+        ]
+
+    @mock.patch("airflow.security.kerberos._tgt_seconds_remaining", mock.Mock(return_value=0))
+    @mock.patch("airflow.security.kerberos._renew_from_kt")
+    @mock.patch("time.monotonic")
+    @mock.patch("time.sleep", return_value=None)
+    def test_run_sleep_corrects_for_drift(self, mock_sleep, mock_monotonic, mock_renew_from_kt):
+        # kinit takes 10s on the first renewal and 4000s (longer than the period) on the second.
+        mock_monotonic.side_effect = [0.0, 10.0, 7600.0]
+        mock_renew_from_kt.side_effect = [0, 0, SystemExit(42)]
+        with conf_vars({("kerberos", "reinit_frequency"): "3600"}), pytest.raises(SystemExit):
+            kerberos.run(principal="test-principal", keytab="/tmp/keytab")
+        assert mock_sleep.mock_calls == [mock.call(3590.0), mock.call(0.0)]
+
+    @mock.patch("airflow.security.kerberos._tgt_seconds_remaining", mock.Mock(return_value=0))
+    @mock.patch("airflow.security.kerberos._renew_from_kt")
+    @mock.patch("airflow.security.kerberos.get_hostname", return_value="HOST")
+    @mock.patch("time.sleep", return_value=None)
+    def test_run_resolves_settings_once(self, mock_sleep, mock_get_hostname, mock_renew_from_kt):
+        mock_renew_from_kt.side_effect = [0, 0, SystemExit(42)]
+        with conf_vars({("kerberos", "principal"): "airflow/_HOST"}), pytest.raises(SystemExit):
+            kerberos.run(principal=None, keytab="/tmp/keytab")
+        mock_get_hostname.assert_called_once()
+        assert mock_renew_from_kt.call_count == 3
+
+    def test_run_async_without_keytab(self, caplog):
+        with caplog.at_level(logging.WARNING, logger=kerberos.log.name):
+            caplog.clear()
+            with pytest.raises(SystemExit) as ctx:
+                asyncio.run(kerberos.run_async(principal="test-principal", keytab=None))
+        assert ctx.value.code == 0
+        assert caplog.messages == ["Keytab renewer not starting, no keytab configured"]
+
+    @mock.patch("airflow.security.kerberos._renew_from_kt_async", new_callable=mock.AsyncMock)
+    @mock.patch("airflow.security.kerberos._tgt_seconds_remaining")
+    @mock.patch("asyncio.sleep", new_callable=mock.AsyncMock)
+    def test_run_async_standard(self, mock_sleep, mock_tgt_seconds_remaining, mock_renew_from_kt_async):
+        remaining = iter([36000, 0, 0])
+        checked_from = []
+
+        def tgt_seconds_remaining(ccache, principal):
+            checked_from.append(threading.get_ident())
+            return next(remaining)
+
+        mock_tgt_seconds_remaining.side_effect = tgt_seconds_remaining
+        mock_renew_from_kt_async.side_effect = [0, 3]
+        with conf_vars({("kerberos", "reinit_frequency"): "3600"}), pytest.raises(SystemExit) as ctx:
+            asyncio.run(kerberos.run_async(principal="test-principal", keytab="/tmp/keytab"))
+        assert ctx.value.code == 3
+        # The ccache is read off the event loop, as it may wait for another renewer's lock.
+        assert len(checked_from) == 3
+        assert threading.get_ident() not in checked_from
+        # The first cycle is skipped because the TGT is still valid, the third renewal fails.
+        assert mock_renew_from_kt_async.await_count == 2
+        # Sleeping is mocked, so each deadline is one more period away from "now".
+        assert [sleep_call.args[0] for sleep_call in mock_sleep.await_args_list] == [
+            pytest.approx(3600, abs=60),
+            pytest.approx(7200, abs=60),
         ]
 
+    @mock.patch("airflow.security.kerberos._renew_from_kt_async", new_callable=mock.AsyncMock)
+    def test_run_async_one_time(self, mock_renew_from_kt_async):
+        mock_renew_from_kt_async.return_value = 0
+        asyncio.run(
+            kerberos.run_async(
+                principal="test-principal", keytab="/tmp/keytab", mode=kerberos.KerberosMode.ONE_TIME
+            )
+        )
+        mock_renew_from_kt_async.assert_awaited_once_with(mock.ANY, "/tmp/keytab")
+        assert mock_renew_from_kt_async.call_args.args[0].principal == "test-principal"
+
     def test_get_kerberos_principal(self):
         expected_principal = "test-principal"
         principal = get_kerberos_principal(expected_principal)